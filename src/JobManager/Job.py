@@ -1,6 +1,8 @@
 #! /usr/bin/env python
 
+import logging
 import rospy
+from array import array
 
 from Tasks import TaskStatus
 from MobileExecutor import MExStatus, MobileExecutor
@@ -8,6 +10,7 @@ from Order import OrderKeyword
 from enum import Enum
 
 NAME = "[Job.py] "
+ROSOUT_LOGGER = logging.getLogger("rosout")     # Python logger used by rospy.log* functions.
 
 #region Enumerators
 class JobStatus(Enum):
@@ -26,8 +29,11 @@ class JobPriority(Enum):
     CRITICAL = 4
 #endregion
 
-class Job:
+class Job(object):
     """ Class which contains overall job details and a list of job-tasks for individual jobs. """
+    __slots__ = ('id', 'mex_id', 'status', 'task_count', 'task_current', 'task_list', 'task_status_arr',
+        'priority', 'completion_callback', 'keyword')
+
     def __init__(self, job_id, completion_cb, keyword, mex_id=None, priority=JobPriority.LOW):
         self.id = job_id                                # Unique identifier for this job, e.g. "job001"
         self.mex_id = mex_id                            # Unique identifier for an existing Mobile Executor (MEx), e.g. "rdg01"
@@ -35,6 +41,7 @@ class Job:
         self.task_count = 0                             # Current number of tasks for this job in the Job's task_list
         self.task_current = None                        # The task currently active.
         self.task_list = []                             # List of tasks for this Job.
+        self.task_status_arr = array('B')               # Status value of each task in task_list, one byte per task.
         self.priority = priority                        # Priority of the job, default LOW. Levels: LOW, MEDIUM, HIGH, CRITICAL
         self.completion_callback = completion_cb        # Callback function to call when Job has finished.
         self.keyword = keyword                          # Keyword from the order used to create this Job from.
@@ -42,13 +49,14 @@ class Job:
     def add_task(self, task):
         """ Add a single task to the job's task list and update task count. """
         self.task_list.append(task)
-        self.task_count = len(self.task_list)
+        self.task_status_arr.append(task.status)
+        self.task_count += 1
 
     def add_tasks(self, list_of_tasks):
         """ Add a multiple tasks from a list to the job's task list and update task count. """
-        for task in list_of_tasks:
-            self.task_list.append(task)
-        self.task_count = len(self.task_list)
+        self.task_list.extend(list_of_tasks)
+        self.task_status_arr.extend(task.status for task in list_of_tasks)
+        self.task_count += len(list_of_tasks)
 
     def assign_mex(self, mex_id):
         """ Assign a mex_id to this job, if status is either pending or assigned. """
@@ -61,6 +69,7 @@ class Job:
         if self.status == JobStatus.ASSIGNED:
             self.status = JobStatus.ACTIVE        # Set status to active
             self.task_current = 0   # Set the current task to the 1st task in the list
+            self.task_status_arr[self.task_current] = TaskStatus.ACTIVE
             self.task_list[self.task_current].start(self.mex_id, self.task_current, self.task_cb)
         else:
             rospy.loginfo(self.id + " Job status is not equal to assigned; cannot start the job.")
@@ -69,41 +78,84 @@ class Job:
         """ Start executing the next task in the job's task_list, if the status is still ACTIVE. """
         if self.status == JobStatus.ACTIVE:
             self.task_current += 1
+            self.task_status_arr[self.task_current] = TaskStatus.ACTIVE
             self.task_list[self.task_current].start(self.mex_id, self.task_current, self.task_cb)
 
     def task_cb(self, data):
-        """ Callback method for the tasks in the job's task list to call upon completion/cancellation/abort. """
-        print(NAME + self.id + ". Task cb: " + str(data))
+        """
+        Callback method for the tasks in the job's task list to call upon completion/cancellation/abort.
+        Dispatches on the (job status, task status) pair using TASK_CB_TABLE.
+        """
+        rospy.logdebug("%s%s. Task cb: %s", NAME, self.id, data)
         task_id = data[0]
         task_status = data[1]
         if task_id == self.task_current:
             # task_status can be:    PENDING, ACTIVE, CANCELLED, SUCCEEDED, ABORTED
+            self.task_status_arr[task_id] = task_status
+            Job.TASK_CB_TABLE.get((self.status, task_status), Job.on_task_unexpected)(self, task_status)
+        else:
+            rospy.logwarn("Mismatch between task callback ID and job's current task.")
 
-            if task_status == TaskStatus.SUCCEEDED:
-                # Succesful completion of the task.
-                if self.task_current + 1 < len(self.task_list):
-                    # Continue with next.
-                    self.next_task()
-                else:
-                    # End of the job's task_list reached. Job is complete.
-                    self.status = JobStatus.SUCCEEDED
-                    self.info()
-                    self.completion_callback(self.id, self.mex_id)
-            elif task_status == TaskStatus.CANCELLED or task_status == TaskStatus.ABORTED:
-                # The task was cancelled/aborted, update job status
-                self.status = JobStatus.ABORTED
-                self.info()
-                self.completion_callback(self.id, self.mex_id)
-            elif task_status == TaskStatus.ACTIVE:
-                # The task is still active, don't do anything.
-                pass
+    def finish_job(self, status):
+        """
+        Set the final job status (SUCCEEDED or ABORTED), call the job's completion callback
+        and then release the job's tasks.
+        """
+        self.status = status
+        self.info()
+        self.completion_callback(self.id, self.mex_id)
+        self.release_tasks()
 
+    def release_tasks(self):
+        """
+        Release all tasks of a finished job and drop the task list, so the tasks (and the
+        action clients, callbacks etc. they reference) can be freed.
+        The id, mex_id, status, keyword, task_count and task_status_arr are kept for reporting.
+        """
+        for task in self.task_list:
+            task.release()
+        self.task_list = []
+        self.task_current = None
+
+    #region Task callback handlers, used in TASK_CB_TABLE.
+    def on_task_succeeded(self, task_status):
+        """ Succesful completion of the task, continue with the next task or complete the job. """
+        if self.task_current + 1 < len(self.task_list):
+            # Continue with next.
+            self.next_task()
         else:
-            rospy.logwarn("Mismatch between task callback ID and job's current task.")
+            # End of the job's task_list reached. Job is complete.
+            self.finish_job(JobStatus.SUCCEEDED)
+
+    def on_task_ended(self, task_status):
+        """ The task was cancelled/aborted, abort the job. """
+        self.finish_job(JobStatus.ABORTED)
+
+    def on_task_active(self, task_status):
+        """ The task is still active, don't do anything. """
+        pass
+
+    def on_task_unexpected(self, task_status):
+        """ Task status which is not expected for the job's current status. """
+        rospy.logwarn(self.id + ". Unexpected task status " + str(task_status) + " for job status " + str(self.status) + ".")
+    #endregion
+
+    # Task callback state machine: (job status, task status) -> handler.
+    TASK_CB_TABLE = {
+        (JobStatus.ACTIVE, TaskStatus.SUCCEEDED): on_task_succeeded,
+        (JobStatus.ACTIVE, TaskStatus.CANCELLED): on_task_ended,
+        (JobStatus.ACTIVE, TaskStatus.ABORTED): on_task_ended,
+        (JobStatus.ACTIVE, TaskStatus.ACTIVE): on_task_active,
+    }
+
+    def task_status_count(self, task_status):
+        """ Return the number of tasks in the job's task list with the given TaskStatus. """
+        return self.task_status_arr.count(task_status)
 
     def info(self):
-        """ Prints general Job information to the console. """
-        print(NAME + 
-            "Job info [" + str(self.id) + "]: status = " + str(self.status) + 
-            ", mex_id = " + str(self.mex_id) + ", tasks = " + str(self.task_count) + 
-            ", current task = " + str(self.task_current)) #+ "\nTask list = " + str(self.task_list))
\ No newline at end of file
+        """ Logs general Job information to the console at debug level. """
+        if not ROSOUT_LOGGER.isEnabledFor(logging.DEBUG):
+            return      # Skip counting the succeeded tasks if the message is not logged anyway.
+        rospy.logdebug("%sJob info [%s]: status = %s, mex_id = %s, tasks = %s, tasks succeeded = %s, current task = %s",
+            NAME, self.id, self.status, self.mex_id, self.task_count,
+            self.task_status_count(TaskStatus.SUCCEEDED), self.task_current)
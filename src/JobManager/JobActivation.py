@@ -1,90 +1,144 @@
 #! /usr/bin/env python
 
+import rospy
+from collections import deque
 from Job import JobStatus
 from MobileExecutor import MExStatus
-from JobServiceMethods import call_get_mex_list, call_assign_job, call_change_mex_status
 from Order import OrderKeyword
 import ClosestMex as cm
 
 NAME = "[JobActivation.py] "
 
+def index_mex_list(mexs_list):
+    """
+    Build lookup structures for a MExs list in a single pass.
+    Returns a tuple of a deque with the STANDBY MExs (in list order) and
+    a dictionary mapping MEx ID to MEx.
+    """
+    STANDBY = MExStatus.STANDBY
+    standby_mexs = deque()
+    mex_by_id = {}
+    for mex in mexs_list:
+        mex_by_id[mex.id] = mex
+        if mex.status == STANDBY:
+            standby_mexs.append(mex)
+    return standby_mexs, mex_by_id
+
+def next_standby_mex(standby_mexs):
+    """
+    Pop MExs from the front of the standby deque until one which is still STANDBY is found.
+    MExs which were allocated through a direct ID lookup are dropped lazily here.
+    Returns the MEx or None if no STANDBY MEx is left.
+    """
+    STANDBY = MExStatus.STANDBY
+    while standby_mexs:
+        mex = standby_mexs.popleft()
+        if mex.status == STANDBY:
+            return mex
+    return None
+
 # Job Allocator and Job Refiner.
-def job_allocator(pending_jobs_list, active_jobs_list, mexs_list):
+def job_allocator(pending_jobs_list, active_jobs_list, mexs_list, mex_provider=None, on_assigned=None, on_started=None):
     """ 
-    Job Allocator function. Check Pending Jobs list and MExs list to assign a Job to a MEx.
+    Job Allocator function. Check Pending Jobs list and MExs list to assign Jobs to MExs.
 
-    Loops through the Pending Jobs list,
-    finds the first pending Job and matches it with an available MEx (Up to date mex_list retrieved from MEx Sentinel service).
-    If succesful, it removes this Job from the Pending Jobs list and passes
-    it along to the Job Refiner, sends an update to the MEx Sentinel to 
-    update the allocated MEx state. If unsuccesful it returns None.
+    Loops once through the Pending Jobs list (in priority order),
+    matching every pending Job it can with an available MEx from the MExs list, until no MEx is available.
+    The MExs list is the caller's snapshot of the MEx Sentinel's list, which is expected to be
+    kept up to date by the caller; the MExs in it are updated in place on allocation.
+    If a mex_provider function is given, it is called instead to retrieve an up-to-date MExs list.
+    Each allocated Job is removed from the Pending Jobs list, on_assigned(job_id, mex_id) is called
+    (e.g. to update the allocated MEx state at the MEx Sentinel) and the Job is passed along to the Job Refiner.
+    on_assigned and on_started (see job_refiner) are optional, if not given nothing is called.
+    Allocation stays correct without them: a MEx is only allocated if it is in the MExs list and its
+    copy there is STANDBY, also for the closest MEx, so a MEx is never allocated twice within one call.
+    Returns the list of allocated Jobs, which is empty if no Job could be allocated.
     Should be called/triggered whenever a change is made to either list. 
     """
 
-    
-    error_code = 0
+    # Bind the Enum members used in the loop to locals, saving an Enum class lookup per iteration.
+    PENDING = JobStatus.PENDING
+    STANDBY = MExStatus.STANDBY
+    ASSIGNED = MExStatus.ASSIGNED
+    MOVE = OrderKeyword.MOVE.name
+    TRANSPORT = OrderKeyword.TRANSPORT.name
 
-    # First query the MEx Sentinal for an up-to-date MExs list.
-    mexs_list = call_get_mex_list()
+    allocated_jobs = []
+    if mex_provider is not None:
+        mexs_list = mex_provider()
+    if mexs_list is None:
+        return allocated_jobs   # No MExs list available (MEx Sentinel unreachable), could not allocate Job to MEx.
+    standby_mexs, mex_by_id = index_mex_list(mexs_list)
+    standby_count = len(standby_mexs)
 
-    allocated_job_index = None
-    for index, job in enumerate(pending_jobs_list):
-        if allocated_job_index != None:
-            print(NAME + "Allocated index: " + str(allocated_job_index))
-            break
-        elif job.status == JobStatus.PENDING:
-            # print(NAME + "Trying for index: " + str(index))
-            # Found a job which is still pending, now find available and/or closest MEx.
-            # First differentiate between Jobs that require a closest MEx and Jobs that do not.
-            if job.keyword == OrderKeyword.MOVE.name or job.keyword == OrderKeyword.TRANSPORT.name:
-                # Find Closest MEx
-                mex_id, mex_distance = cm.choose_closest_mex(location=job.task_list[0].location)   # First task in MOVE or TRANSPORT is RobotMoveBase which has attribute location.
-                if mex_id != None:
-                    job.assign_mex(mex_id)
-                    allocated_job_index = index
+    # Loop over a copy, allocated jobs are removed from the Pending Jobs list during the loop.
+    for job in list(pending_jobs_list):
+        if standby_count == 0:
+            break           # No MEx available anymore, the remaining jobs can not be allocated.
+        if job.status != PENDING:
+            continue
+        rospy.logdebug("%sTrying for job: %s", NAME, job.id)
+        # Found a job which is still pending, now find available and/or closest MEx.
+        # First differentiate between Jobs that require a closest MEx and Jobs that do not.
+        if job.keyword == MOVE or job.keyword == TRANSPORT:
+            # Find Closest MEx
+            mex_id, mex_distance = cm.choose_closest_mex(location=job.task_list[0].location)   # First task in MOVE or TRANSPORT is RobotMoveBase which has attribute location.
+            if mex_id == None:
+                continue
+            mex = mex_by_id.get(mex_id)
+            if mex is None or mex.status != STANDBY:
+                # Unknown in the local MExs list (outdated list) or already allocated earlier in this pass
+                # (MEx Sentinel not updated yet); it can't be marked as taken locally, so don't allocate it.
+                continue
+        else:
+            # Distance does not matter, so find first available MEx.
+            # Check if the job has got a MEx pre-assigned, if so it has to be that MEx.
+            if job.mex_id:
+                mex = mex_by_id.get(job.mex_id)
+                if mex is None or mex.status != STANDBY:
+                    continue
             else:
-                # Distance does not matter, so find first available MEx in the list.
-                for mex in mexs_list:
-                    if mex.status == MExStatus.STANDBY:
-                        # Found a MEx which is available (standby)
-                        # Check if the job has not got a MEx pre-assigned OR the pre-assigned mex_id matches the MEx's id
-                        if (not job.mex_id) or (job.mex_id == mex.id): 
-                            mex.status = MExStatus.ASSIGNED
-                            mex.job_id = job.id
-                            job.assign_mex(mex.id)
-                            allocated_job_index = index
-                            break
-    else:
-        # Loop ended without a break
-        error_code = 1      # Could not allocate Job to MEx.
+                mex = next_standby_mex(standby_mexs)
+                if mex is None:
+                    continue
+            mex_id = mex.id
+        # Found a MEx which is available (standby), update the local copy of it.
+        standby_count -= 1
+        mex.status = ASSIGNED
+        mex.job_id = job.id
+        job.assign_mex(mex_id)
 
-    if allocated_job_index != None:
-        rough_job = pending_jobs_list.pop(allocated_job_index)  # Removes the allocated job from the Pending Jobs lists.
-        call_assign_job(rough_job.id, rough_job.mex_id)         # Send update to MEx Sentinel to update the assigned MEx state.
+        rospy.logdebug("%sAllocated %s to %s", NAME, job.id, mex_id)
+        pending_jobs_list.remove(job)               # Removes the allocated job from the Pending Jobs lists.
+        # Send update (e.g. to MEx Sentinel) to update the assigned MEx state right away,
+        # so the closest MEx search for the next jobs does not consider this MEx anymore.
+        if on_assigned is not None:
+            on_assigned(job.id, job.mex_id)
+        job_refiner(active_jobs_list, mex, job, on_started)
+        allocated_jobs.append(job)
 
-        return job_refiner(active_jobs_list, mexs_list, rough_job)
-    else:
-        return error_code     # Failed to allocate any pending jobs.
+    return allocated_jobs
 
 
-def job_refiner(active_jobs_list, mexs_list, rough_job):
+def job_refiner(active_jobs_list, mex, rough_job, on_started=None):
     """
     Job Refiner function.
     Takes in a rough job and based on the allocated MEx refines the Jobs Tasks to match MEx attributes.
-    Starts the Job, sends update to the MEx Sentinel to update the MEx state and 
-    then adds the refined Job to the Active Jobs list.
+    The allocated MEx is the local MExs list copy, or None if it is not in the local list.
+    Starts the Job, calls on_started(mex_id, MExStatus.EXECUTING_TASK) if given (e.g. to update the
+    MEx state at the MEx Sentinel) and then adds the refined Job to the Active Jobs list.
     """
     refined_job = rough_job
     # TODO Refine the Job's tasks based on the rough job's tasks and the assigned MEx attributes.
 
     refined_job.start_job()
-    # Update local copy of MEx Sentinel mex_list (TODO Check: Does this change job_manager mex_list?)
-    for mex in mexs_list:
-        if mex.id == refined_job.mex_id and mex.job_id == refined_job.id:
-            mex.status = MExStatus.EXECUTING_TASK
+    # Update local copy of the MEx, which is the job_manager's cached mex_list entry.
+    if mex is not None and mex.job_id == refined_job.id:
+        mex.status = MExStatus.EXECUTING_TASK
     
-    # Send update to MEx Sentinel to update the started MEx state.
-    call_change_mex_status(refined_job.mex_id, MExStatus.EXECUTING_TASK)
+    # Send update (e.g. to MEx Sentinel) to update the started MEx state.
+    if on_started is not None:
+        on_started(refined_job.mex_id, MExStatus.EXECUTING_TASK)
 
     active_jobs_list.append(refined_job)
     return 0    # Return a 0, no errors.
\ No newline at end of file
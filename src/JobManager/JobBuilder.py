@@ -7,12 +7,29 @@ from Order import *
 
 NAME = "[JobBuilder.py] "
 
+def pending_insert_index(pending_jobs_list, priority):
+    """
+    Binary search on the Pending Jobs list, which is sorted on priority from high to low.
+    Returns the index after the last job with the same or a higher priority value,
+    so jobs with equal priority keep their order of arrival.
+    """
+    low = 0
+    high = len(pending_jobs_list)
+    while low < high:
+        middle = (low + high) // 2
+        if pending_jobs_list[middle].priority.value < priority:
+            high = middle
+        else:
+            low = middle + 1
+    return low
+
 def job_builder(pending_jobs_list, order, job_index, location_dict, completion_cb):
     """
     Job Builder
     Takes in order consisting of: keyword, priority and arguments; and creates a Job class instance
     containing Task class instances depening on the keyword and arguments.
-    Then inserts/appends the Job to the Pending Jobs list depening on the priority.
+    Then inserts/appends the Job to the Pending Jobs list depening on the priority,
+    keeping the list sorted so the Job Allocator handles higher priority Jobs first.
     """
     index = "00" + str(job_index) if job_index < 10 else ( "0" + str(job_index) if job_index < 100 else str(job_index) )
     keyword = order[0]
@@ -38,14 +55,12 @@ def job_builder(pending_jobs_list, order, job_index, location_dict, completion_c
         # Unload order on the spot.
         rough_job.add_task(AwaitingUnloadCompletion())
 
-    # Loop over the current list of Pending Jobs with index, find the last spot in the list within the same priority section.
-    for index, job in enumerate(pending_jobs_list):
-        priority = job.priority.value
-        if priority < rough_job.priority.value:
-            print(NAME + "Inserting Rough Job (" + rough_job.id + ") at position " + str(index))
-            pending_jobs_list.insert(index, rough_job)
-            break
-    else:   # Looped over all jobs in the pending_jobs_list and it wasn't inserted, so just append to the end.
+    # Find the last spot in the Pending Jobs list within the same priority section, the list is kept sorted on priority (high to low).
+    index = pending_insert_index(pending_jobs_list, rough_job.priority.value)
+    if index < len(pending_jobs_list):
+        print(NAME + "Inserting Rough Job (" + rough_job.id + ") at position " + str(index))
+        pending_jobs_list.insert(index, rough_job)
+    else:   # All jobs in the pending_jobs_list have the same or a higher priority, so just append to the end.
         print(NAME + "Appending Rough Job (" + rough_job.id + ") to end")
         pending_jobs_list.append(rough_job)
         
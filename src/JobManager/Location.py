@@ -1,17 +1,23 @@
 #! /usr/bin/env python
 
 import rospy
+from math import sin, cos
 
 NAME = "[Location.py] "
 
-class Location:
+class Location(object):
     """ Class with location information (name, position, orientation) based on map reference frame. """
+    __slots__ = ('id', 'name', 'x', 'y', 'theta', 'qz', 'qw')
+
     def __init__(self, id, name, x_coordinate, y_coordinate, theta):
         self.id = id                # Unique identifier for this location, e.g. "loc01"
         self.name = name            # Name of the location, string
         self.x = x_coordinate       # X position in map frame in meters, float
         self.y = y_coordinate       # Y position in map frame in meters, float
         self.theta = theta          # Orientation (yaw angle) in map frame in radians, float
+        # Orientation as quaternion (x and y are 0 as roll and pitch are 0), computed once for the move_base goals.
+        self.qz = sin(theta / 2.0)
+        self.qw = cos(theta / 2.0)
 
     def info(self):
         """ Method which prints out general Location information to the console. """
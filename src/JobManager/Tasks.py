@@ -1,23 +1,23 @@
 #! /usr/bin/env python
 
+import threading
 import rospy
 import actionlib
 from move_base_msgs.msg import MoveBaseAction, MoveBaseGoal
-from tf.transformations import quaternion_from_euler
 from std_msgs.msg import UInt8
-from enum import Enum
+from enum import IntEnum
 
 #region ################## TODOLIST ########################
 # DONE 1. Add Task class and make other task classes inherit from it.
 #endregion #################################################
 
-class TaskType(Enum):
+class TaskType(IntEnum):
     """Class that acts as an enum for the different kinds of tasks."""
     ROBOTMOVEBASE = 0
     AWAITINGLOADCOMPLETION = 1
     AWAITINGUNLOADCOMPLETION = 2
 
-class TaskStatus(Enum):
+class TaskStatus(IntEnum):
     """ Class that acts as Enumerator for Task status. """
     # 0 = PENDING, 1 = ACTIVE, 2 = CANCELLED, 3 = SUCCEEDED, 4 = ABORTED
     PENDING = 0
@@ -26,15 +26,52 @@ class TaskStatus(Enum):
     SUCCEEDED = 3
     ABORTED = 4
 
+# Task statuses which mark the end of a task: cancel, succes or abort.
+TASK_END_STATUSES = frozenset([TaskStatus.CANCELLED, TaskStatus.SUCCEEDED, TaskStatus.ABORTED])
+
+# Terminal move_base (actionlib) goal status mapped to the resulting Task status and a log description.
+# move_base status options: PENDING=0, ACTIVE=1, PREEMPTED=2, SUCCEEDED=3,
+# ABORTED=4, REJECTED=5, PREEMPTING=6, RECALLING=7, RECALLED=8, LOST=9.
+MOVE_BASE_STATUS = {
+    2: (TaskStatus.CANCELLED, "cancelled"),     # PREEMPTED
+    3: (TaskStatus.SUCCEEDED, "reached"),       # SUCCEEDED
+    4: (TaskStatus.ABORTED, "aborted"),         # ABORTED
+    5: (TaskStatus.CANCELLED, "rejected"),      # REJECTED
+    8: (TaskStatus.CANCELLED, "cancelled"),     # RECALLED
+    9: (TaskStatus.ABORTED, "lost"),            # LOST
+}
+
+# move_base SimpleActionClients per MEx ID, created and connected once and reused by all RobotMoveBase tasks of that MEx.
+NAVCLIENTS = {}
+
+# Shared load/unload input subscribers per topic (e.g. "rdg01/LoadInput"), created once and kept,
+# and the task currently awaiting input on each of those topics.
+INPUT_SUBSCRIBERS = {}
+ACTIVE_INPUT_TASKS = {}
+
+def input_dispatch_cb(data, topic):
+    """
+    Callback for the shared load/unload input subscribers.
+    Forwards the user or system input to the task awaiting input on the topic, if any.
+    """
+    task = ACTIVE_INPUT_TASKS.get(topic)
+    if task is not None:
+        task.input_cb(data)
+
 class Task(object):
     """
     Base class from which specific child task classes inherit.
+    Task classes use __slots__, as a task instance is created for every task of every job.
     """
+    __slots__ = ('id', 'status', 'type', 'child_action', 'task_id', 'job_callback')
+
     def __init__(self, tasktype, child_start):
         self.id = None                          # ID of the MEx to perform the task on/with
         self.status = TaskStatus.PENDING        # Status of this task.
         self.type = tasktype                    # Type of the task, defined by child.
-        self.child_start = child_start          # The child's task specific start method.
+        self.child_action = child_start         # The child's task specific start method.
+        self.task_id = None                     # Index of this task in the job's task list, set when the task starts.
+        self.job_callback = None                # The job's task callback, set when the task starts.
     
     def start(self, mex_id, task_id, job_callback):
         """
@@ -46,21 +83,31 @@ class Task(object):
         self.task_id = task_id
         self.job_callback = job_callback
         self.status = TaskStatus.ACTIVE
-        self.child_start()
+        self.child_action()
 
     def get_status(self):
         """ Return the status of the task. """
         return self.status
 
+    def release(self):
+        """
+        Release the references this task holds once its job has finished, so they can be freed.
+        Any late callbacks of the task are ignored afterwards.
+        """
+        self.job_callback = None
+
 
 class RobotMoveBase(Task):
     """
     Task class: RobotMoveBase, implements move_base action calls to robot navigation stack.
     Used by the higher level Job class to populate a list with its job tasks.
     """
+    __slots__ = ('location', 'navclient')
+
     def __init__(self, location):
         super(RobotMoveBase, self).__init__(TaskType.ROBOTMOVEBASE, self.move_robot)
         self.location = location            # location of the goal of the move_base.
+        self.navclient = None               # The MEx's move_base action client, set when the task starts.
 
     #region Callback definitions
     def active_cb(self):
@@ -85,25 +132,41 @@ class RobotMoveBase(Task):
         move_base callback status options: PENDING=0, ACTIVE=1, PREEMPTED=2, SUCCEEDED=3,
         ABORTED=4, REJECTED=5, PREEMPTING=6, RECALLING=7, RECALLED=8, LOST=9.
         """
-        if status == 3:
-            self.status = TaskStatus.SUCCEEDED
-            rospy.loginfo(self.id + ". Goal reached")
-        if status == 2 or status == 8:
-            self.status = TaskStatus.CANCELLED
-            rospy.loginfo(self.id + ". Goal cancelled")
-        if status == 4:
-            self.status = TaskStatus.ABORTED
-            rospy.loginfo(self.id + ". Goal aborted")
-        
+        move_base_status = MOVE_BASE_STATUS.get(status)
+        if move_base_status is None:
+            rospy.logwarn(self.id + ". Unexpected move_base goal status: " + str(status))
+            return
+        self.status, description = move_base_status
+        rospy.loginfo(self.id + ". Goal " + description)
+
         if self.job_callback:
             self.job_callback([self.task_id, self.status])
     #endregion
 
     def move_robot(self):
-        """ Start a move_base action using actionlib. """
-        self.navclient = actionlib.SimpleActionClient(self.id + '/move_base',MoveBaseAction)
-        self.navclient.wait_for_server()
+        """
+        Start a move_base action using actionlib, reusing the MEx's action client if there is one.
+        Otherwise the client is created and connected on a separate thread, which then sends the goal,
+        so the caller (often a ROS callback) is not blocked while waiting for the move_base server.
+        """
+        self.navclient = NAVCLIENTS.get(self.id)
+        if self.navclient is None:
+            connect_thread = threading.Thread(target=self.connect_and_send_goal)
+            connect_thread.daemon = True
+            connect_thread.start()
+        else:
+            self.send_goal()
+
+    def connect_and_send_goal(self):
+        """ Create the MEx's move_base action client, wait for the server and then send the goal. """
+        navclient = actionlib.SimpleActionClient(self.id + '/move_base',MoveBaseAction)
+        navclient.wait_for_server()
+        NAVCLIENTS[self.id] = navclient
+        self.navclient = navclient
+        self.send_goal()
 
+    def send_goal(self):
+        """ Send the move_base goal for this task's location using the MEx's action client. """
         goal = MoveBaseGoal()
         goal.target_pose.header.frame_id = "map"
         goal.target_pose.header.stamp = rospy.Time.now()
@@ -111,14 +174,21 @@ class RobotMoveBase(Task):
         goal.target_pose.pose.position.x = self.location.x
         goal.target_pose.pose.position.y = self.location.y
         goal.target_pose.pose.position.z = 0.0
-        quaternion = quaternion_from_euler(0, 0, self.location.theta)
-        goal.target_pose.pose.orientation.x = quaternion[0]
-        goal.target_pose.pose.orientation.y = quaternion[1]
-        goal.target_pose.pose.orientation.z = quaternion[2]
-        goal.target_pose.pose.orientation.w = quaternion[3]
+        goal.target_pose.pose.orientation.x = 0.0
+        goal.target_pose.pose.orientation.y = 0.0
+        goal.target_pose.pose.orientation.z = self.location.qz     # Precomputed from theta by the Location.
+        goal.target_pose.pose.orientation.w = self.location.qw
 
         self.navclient.send_goal(goal, done_cb=self.done_cb, active_cb=self.active_cb, feedback_cb=self.feedback_cb)
     
+    def release(self):
+        """
+        Overwrites base class release, but inherits using super().
+        Drops the reference to the MEx's action client; the client itself is kept in NAVCLIENTS for reuse.
+        """
+        self.navclient = None
+        super(RobotMoveBase, self).release()
+
     def get_status(self):
         """ 
         Overwrites base class get_status, but inherits using super().
@@ -145,13 +215,26 @@ class AwaitingLoadCompletion(Task):
     Task class: AwaitingLoadCompletion, waits for input from user or system to mark loading of the MEx as succeeded, cancelled, aborted.
     Used by the higher level Job class to populate a list with its job tasks.
     """
+    __slots__ = ('input_topic',)
+
     def __init__(self):
         super(AwaitingLoadCompletion, self).__init__(TaskType.AWAITINGLOADCOMPLETION, self.child_start)
+        self.input_topic = None             # Topic on which this task awaits input, set when the task starts.
 
     def child_start(self):
-        """ Start the task's specific action, subscribing to the /LoadInput topic on the MEx's namespace. """
-        self.input_subcriber = rospy.Subscriber(self.id + "/LoadInput", UInt8, self.input_cb)	# Subscribe to /'mex_id'/LoadInput topic to listen for published user/system input.
+        """ Start the task's specific action, awaiting input on the /LoadInput topic on the MEx's namespace. """
+        self.await_input(self.id + "/LoadInput")	# Listen on /'mex_id'/LoadInput topic for published user/system input.
         rospy.loginfo(self.id + ". Awaiting load completion input...")
+
+    def await_input(self, topic):
+        """
+        Register this task as the one awaiting input on the topic.
+        The topic's subscriber is shared by all tasks and only created the first time the topic is used.
+        """
+        self.input_topic = topic
+        ACTIVE_INPUT_TASKS[topic] = self
+        if topic not in INPUT_SUBSCRIBERS:
+            INPUT_SUBSCRIBERS[topic] = rospy.Subscriber(topic, UInt8, input_dispatch_cb, callback_args=topic)
     
     def input_cb(self, data):
         """
@@ -161,33 +244,36 @@ class AwaitingLoadCompletion(Task):
         ABORTED=4.
         """
         if self.job_callback:      # Only process callback if this task was started.
-            # Input received from user/system,
-            if data.data == 3:
-                # Loading was completed succesfully.
-                self.status = TaskStatus.SUCCEEDED
-            elif data.data == 2:
-                # Loading was cancelled by user.
-                self.status = TaskStatus.CANCELLED
-            elif data.data == 4:
-                # Loading encountered an error and had to abort.
-                self.status = TaskStatus.ABORTED
-            
-            if data.data == 2 or data.data == 3 or data.data == 4:   # User input meaning some kind of end: cancel, succes or abort.
-                self.input_subcriber.unregister()   # Unsubscribe to topic, as this task of the job is done.
+            # Input received from user/system, the input values match the TaskStatus values.
+            if data.data in TASK_END_STATUSES:   # User input meaning some kind of end: cancel, succes or abort.
+                self.status = TaskStatus(data.data)
+                if ACTIVE_INPUT_TASKS.get(self.input_topic) is self:
+                    del ACTIVE_INPUT_TASKS[self.input_topic]   # Stop awaiting input on the topic, as this task of the job is done.
 
             self.job_callback([self.task_id, self.status])     # Call the higher level Job callback.
 
+    def release(self):
+        """
+        Overwrites base class release, but inherits using super().
+        Stops awaiting input if the task was still awaiting input; the shared subscriber is kept for reuse.
+        """
+        if ACTIVE_INPUT_TASKS.get(self.input_topic) is self:
+            del ACTIVE_INPUT_TASKS[self.input_topic]
+        super(AwaitingLoadCompletion, self).release()
+
 class AwaitingUnloadCompletion(AwaitingLoadCompletion):
     """
     Task class: AwaitingUnloadCompletion, waits for input from user or system to mark unloading of the MEx as succeeded, cancelled, aborted.
     Used by the higher level Job class to populate a list with its job tasks.
     Inherets from AwaitingLoadCompletion.
     """
+    __slots__ = ()
+
     def __init__(self):
         super(AwaitingUnloadCompletion, self).__init__()
         self.type = TaskType.AWAITINGUNLOADCOMPLETION
     
     def child_start(self):
-        """ Start the task's specific action, subscribing to the /UnloadInput topic on the MEx's namespace. """
-        self.input_subcriber = rospy.Subscriber(self.id + "/UnloadInput", UInt8, self.input_cb) # Subscribe to /'mex_id'/UnloadInput topic to listen for published user/system input.
+        """ Start the task's specific action, awaiting input on the /UnloadInput topic on the MEx's namespace. """
+        self.await_input(self.id + "/UnloadInput")    # Listen on /'mex_id'/UnloadInput topic for published user/system input.
         rospy.loginfo(self.id + ". Awaiting unload completion input...")
\ No newline at end of file
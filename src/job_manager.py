@@ -12,12 +12,12 @@ from JobManager.JobBuilder import job_builder
 from JobManager.JobActivation import job_allocator, job_refiner
 from JobManager.MobileExecutor import MExStatus, MobileExecutor
 from JobManager.Order import *
-from JobManager.JobServiceMethods import call_get_mex_list, call_unassign_job
+from JobManager.JobServiceMethods import call_get_mex_list, call_unassign_job, call_assign_job, call_change_mex_status
 
 from rooster_fleet_manager.srv import PlaceOrder, PlaceOrderResponse, GetPendingJobs, GetPendingJobsResponse, \
     GetActiveJobs, GetActiveJobsResponse, GetJobInfo, GetJobInfoResponse, \
     GetMexList, GetMexListResponse, GetMexListRequest, AssignJobToMex, AssignJobToMexRequest
-from rooster_fleet_manager.msg import PendingJob, ActiveJob, JobInfo, TaskInfo
+from rooster_fleet_manager.msg import PendingJob, ActiveJob, JobInfo, TaskInfo, MexListInfo
 
 NODE_NAME = "[job_manager] "
 
@@ -219,6 +219,28 @@ def get_job_info_service_cb(request):
     return job_info_response
 #endregion
 
+#region Subscriber callback definitions
+
+# - MEx Sentinel mex_list_info callback -
+def mex_list_info_cb(data):
+    """
+    Subscription callback for the MEx Sentinel mex_list_info topic.
+    Compares the published MEx statuses with the local mex_list copy and
+    marks the local copy as dirty when they differ, so the next job allocation
+    retrieves a fresh list from the MEx Sentinel service.
+    """
+    global mex_list_dirty
+    if mex_list_dirty or mex_list is None:
+        return      # Already going to be refreshed.
+    if len(data.mex_list_info_array) != len(mex_list):
+        mex_list_dirty = True
+        return
+    for mex, mex_info in zip(mex_list, data.mex_list_info_array):
+        if mex.id != mex_info.id or mex.status.name != mex_info.status:
+            mex_list_dirty = True
+            break
+#endregion
+
 #region Timer callback definitons
 
 # - Order list timer callback -
@@ -229,10 +251,27 @@ def order_list_timer_cb(event):
 
 # - Job allocator timer callback -
 def job_allocator_timer_cb(event):
-    """ Job allocator timer callback function. Calls job allocator function. """
-    if job_allocator(pending_jobs_list=pending_job_list, active_jobs_list=active_job_list, mexs_list=mex_list) != 0:
+    """
+    Job allocator timer callback function. Refreshes the local mex_list copy
+    from the MEx Sentinel if it is dirty, then calls job allocator function
+    which allocates as many pending jobs as there are available MExs.
+    Skips the job allocator if neither the Pending Jobs list nor the MEx list
+    has changed since the last failed allocation attempt.
+    """
+    global mex_list, mex_list_dirty, mex_version, last_failed_allocation
+    if mex_list_dirty:
+        mex_list_dirty = False      # Cleared before the call so an invalidation during the call is kept.
+        mex_list = call_get_mex_list()
+        mex_version += 1
+        if mex_list is None:
+            mex_list_dirty = True   # MEx Sentinel unavailable, try again next time.
+    allocation_key = (pending_version, mex_version)
+    if allocation_key == last_failed_allocation:
+        return      # Nothing changed since the last failed attempt, it would fail again.
+    if not job_allocator(pending_jobs_list=pending_job_list, active_jobs_list=active_job_list, mexs_list=mex_list,
+            on_assigned=call_assign_job, on_started=call_change_mex_status):
         # rospy.loginfo("Failed to allocate job.")
-        pass
+        last_failed_allocation = allocation_key
 
 #endregion
 
@@ -243,11 +282,12 @@ def job_completion_cb(job_id, mex_id):
     Jobs is finished (succesful, cancel, error or abort).
     It is attached to a Job in the job_builder function.
     """
+    global mex_list_dirty
     print(NODE_NAME + "Job called the job_completion_cb function: " + str(job_id) + ", " + str(mex_id))
     # First send update to MEx Sentinel to unassign job.
     call_unassign_job(mex_id=mex_id)
-    # Then call MEx Sentinel to provide latest MEx List.
-    mex_list = call_get_mex_list()
+    # Then mark the local MEx list copy as dirty, so it is retrieved again from the MEx Sentinel before the next allocation.
+    mex_list_dirty = True
 
     # Remove completed Job from the active_job_list. 
     index_to_pop = None
@@ -267,18 +307,24 @@ def process_order_list():
     Build jobs from all orders in the order_list by calling 
     the job_builder function, then clear the order_list.
     """
-    global job_index
+    global job_index, pending_version
+    order_count = len(order_list)
     for order in order_list:
         job_index = job_builder(pending_jobs_list=pending_job_list, order=order, job_index=job_index, location_dict=location_dict, completion_cb=job_completion_cb)
     del order_list[:]
+    if order_count:
+        # New jobs have been added to the Pending Jobs list. Only increased after they are in the list,
+        # otherwise the job allocator (on another timer thread) could record a failed attempt for the new version without them.
+        pending_version += 1
 
 if __name__ == '__main__':
     try:
         # Retrieve robots and set up a list of available MobileExecutor (MEx) instances
         mex_list = call_get_mex_list()
+        mex_list_dirty = mex_list is None   # Flag to retrieve the MEx list again before the next allocation.
         # for robot in robot_namespaces:
         #     mex_list.append(MobileExecutor(robot))
-        for mex in mex_list:
+        for mex in mex_list or []:     # mex_list is None if the MEx Sentinel is not available yet.
             print(NODE_NAME + str( (mex.id, mex.status, mex.job_id) ) )
         
         # Lists for Orders, PendingJobs, ActiveJobs:
@@ -287,6 +333,12 @@ if __name__ == '__main__':
         active_job_list = []
         job_index = 1
 
+        # Versions of the Pending Jobs list and MEx list, increased on every change, and the
+        # versions at the last failed job allocation. Used to skip allocations which would fail again.
+        pending_version = 0
+        mex_version = 0
+        last_failed_allocation = None
+
         # Testing the adding of multiple Location class instances, storing them in a dictionary.
         # TODO Replace this with a dynamic(?) dictionary which is constructed from the MEx Sentinel.
         location_dict = make_location_dict()
@@ -300,6 +352,9 @@ if __name__ == '__main__':
         get_active_jobs_service = rospy.Service('~get_active_jobs', GetActiveJobs, get_active_jobs_service_cb)
         get_job_info_service = rospy.Service('~get_job_info', GetJobInfo, get_job_info_service_cb)
 
+        # Initialize subscribers.
+        rospy.Subscriber('/mex_sentinel/mex_list_info', MexListInfo, mex_list_info_cb)    # Invalidates the local MEx list copy on MEx status changes.
+
         # Initialize timers for the JobBuilder, and JobAllocator.
         rospy.Timer(rospy.Duration(1), order_list_timer_cb)     # Every second check order list to try build rough jobs.
         rospy.Timer(rospy.Duration(5), job_allocator_timer_cb)  # Call the job_allocator in 10 seconds to try allocating jobs. 
@@ -1,5 +1,6 @@
 #!/usr/bin/env python
 
+import copy
 import rospy
 from visualization_msgs.msg import Marker, MarkerArray
 from JobManager.Location import Location, make_location_dict
@@ -8,6 +9,54 @@ from JobManager.Location import Location, make_location_dict
 # Each location displays as two markers: a semi-transparent purple screen and white text label. 
 # Each marker is created by a corresponding function
 
+def make_sphere_template():
+    """
+    Function which creates the template for the semi-transparent purple sphere Marker.
+    Contains all the fields which are the same for every location.
+    """
+    sphere_template = Marker()
+    sphere_template.header.frame_id = "/map"
+    sphere_template.header.stamp = rospy.Time(0)    # Time zero, the markers are static.
+    sphere_template.type = Marker.SPHERE
+    sphere_template.action = Marker.ADD
+    sphere_template.pose.position.z = 0
+    sphere_template.pose.orientation.w = 1.0
+    sphere_template.scale.x = 0.5
+    sphere_template.scale.y = 0.5
+    sphere_template.scale.z = 0.5
+    sphere_template.color.r = 1.0
+    sphere_template.color.g = 0.0
+    sphere_template.color.b = 1.0
+    # This has to be, otherwise it will be transparent
+    sphere_template.color.a = 0.5
+    # If we want it forever, 0, otherwise seconds before desapearing
+    sphere_template.lifetime = rospy.Duration(0)
+    return sphere_template
+
+def make_text_template():
+    """
+    Function which creates the template for the white text Marker.
+    Contains all the fields which are the same for every location.
+    """
+    text_template = Marker()
+    text_template.header.frame_id = "/map"
+    text_template.header.stamp = rospy.Time(0)      # Time zero, the markers are static.
+    text_template.type = Marker.TEXT_VIEW_FACING
+    text_template.action = Marker.ADD
+    text_template.pose.position.z = 1
+    text_template.pose.orientation.w = 1.0
+    text_template.scale.z = 1
+    text_template.color.r = 1.0
+    text_template.color.g = 1.0
+    text_template.color.b = 1.0
+    text_template.color.a = 1.0
+    text_template.lifetime = rospy.Duration(0)
+    return text_template
+
+# Marker templates, copied for each location so only the location specific fields have to be set.
+SPHERE_TEMPLATE = make_sphere_template()
+TEXT_TEMPLATE = make_text_template()
+
 def create_sphere_marker(name, x_coordinate, y_coordinate, id):
     """
     Function which creates a semi-transparent purple sphere Marker.
@@ -15,31 +64,11 @@ def create_sphere_marker(name, x_coordinate, y_coordinate, id):
     Returns a Marker object which can then be appended 
     to the marker array and published to Rviz.
     """
-    sphere_name = name + '_sphere'
-    sphere_name = Marker()
-    sphere_name.header.frame_id = "/map"
-    sphere_name.header.stamp    = rospy.get_rostime()
-    sphere_name.id = id
-    sphere_name.type = Marker.SPHERE
-    sphere_name.action = Marker.ADD
-    sphere_name.pose.position.x = x_coordinate
-    sphere_name.pose.position.y = y_coordinate
-    sphere_name.pose.position.z = 0
-    sphere_name.pose.orientation.x = 0
-    sphere_name.pose.orientation.y = 0
-    sphere_name.pose.orientation.z = 0.0
-    sphere_name.pose.orientation.w = 1.0
-    sphere_name.scale.x = 0.5
-    sphere_name.scale.y = 0.5
-    sphere_name.scale.z = 0.5
-    sphere_name.color.r = 1.0
-    sphere_name.color.g = 0.0
-    sphere_name.color.b = 1.0
-    # This has to be, otherwise it will be transparent
-    sphere_name.color.a = 0.5
-    # If we want it forever, 0, otherwise seconds before desapearing
-    sphere_name.lifetime = rospy.Duration(0)
-    return sphere_name
+    sphere_marker = copy.deepcopy(SPHERE_TEMPLATE)
+    sphere_marker.id = id
+    sphere_marker.pose.position.x = x_coordinate
+    sphere_marker.pose.position.y = y_coordinate
+    return sphere_marker
 
 def create_text_marker(name, x_coordinate, y_coordinate, id):
     """ 
@@ -48,32 +77,16 @@ def create_text_marker(name, x_coordinate, y_coordinate, id):
     Returns a Marker object which can then be appended 
     to the marker array and published to Rviz.
     """
-    text_name = name + '_text'
-    text_name = Marker()
-    text_name.header.frame_id = "/map"
-    text_name.header.stamp    = rospy.get_rostime()
-    text_name.id = id
-    text_name.type = Marker.TEXT_VIEW_FACING
-    text_name.action = Marker.ADD
-    text_name.pose.position.x = x_coordinate
-    text_name.pose.position.y = y_coordinate
-    text_name.pose.position.z = 1
-    text_name.pose.orientation.x = 0
-    text_name.pose.orientation.y = 0
-    text_name.pose.orientation.z = 0.0
-    text_name.pose.orientation.w = 1.0
-    text_name.scale.z = 1
-    text_name.color.r = 1.0
-    text_name.color.g = 1.0
-    text_name.color.b = 1.0
-    text_name.color.a = 1.0
-    text_name.lifetime = rospy.Duration(0)
-    text_name.text = name
-    return text_name
+    text_marker = copy.deepcopy(TEXT_TEMPLATE)
+    text_marker.id = id
+    text_marker.pose.position.x = x_coordinate
+    text_marker.pose.position.y = y_coordinate
+    text_marker.text = name
+    return text_marker
 
 if __name__ == '__main__':
     try: 
-        # Initialise node here in order to have rospy.get_rostime() later
+        # Initialise node.
         rospy.init_node('marker_publisher_node', anonymous=True)
 
         # Creating MarkerArray object which the Marker objects can be appended to.
@@ -83,22 +96,18 @@ if __name__ == '__main__':
         location_dict = make_location_dict()
 
         # Go through all the locations, add both sphere and text Markers for each, append to MarkerArray.
-        for key in location_dict:
-            index = key
-            marker_object = create_sphere_marker(location_dict[index].name, location_dict[index].x, location_dict[index].y, int(location_dict[index].id[3:]))
-            marker_array.markers.append(marker_object)    
-            text_object = create_text_marker(location_dict[index].name, location_dict[index].x, location_dict[index].y, int(location_dict[index].id[3:])+100)
-            marker_array.markers.append(text_object)
+        for location in location_dict.values():
+            marker_id = int(location.id[3:])     # Numeric part of the location id, e.g. "loc01" -> 1.
+            marker_array.markers.append(create_sphere_marker(location.name, location.x, location.y, marker_id))
+            marker_array.markers.append(create_text_marker(location.name, location.x, location.y, marker_id + 100))
 
         # Set up the MarkeyArray publisher, publish to marker topic which Rviz is subscribed to.
-        publisher = rospy.Publisher('/visualization_marker_array', MarkerArray, queue_size=1)
-
-        # Set publication rate to once every second (1 Hz)
-        rate = rospy.Rate(1)
+        # The locations are static, so the publisher is latched and publishes only once;
+        # (late) subscribers receive the latched MarkerArray on connecting.
+        publisher = rospy.Publisher('/visualization_marker_array', MarkerArray, queue_size=1, latch=True)
+        publisher.publish(marker_array)
 
-        while not rospy.is_shutdown():
-            # Loop indefenitely until shutdown, publishing at the specified rate.
-            publisher.publish(marker_array)
-            rate.sleep()
+        # Keep node running to serve the latched message.
+        rospy.spin()
     except rospy.ROSInterruptException:
         pass
\ No newline at end of file